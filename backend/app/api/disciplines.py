@@ -2,24 +2,32 @@
 Rotas da API para gerenciamento de disciplinas.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+import asyncio
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from app.models import (
     Discipline, DisciplineCreate, DisciplineUpdate, DisciplineGrades,
     ImportCSVResponse, GradesRequest, FinalExamResponse
 )
-from app.database import Database
-from app.csv_importer import CSVImporter
+from app.database import db
+from app.csv_importer import CSVImporter, CSVStreamParser
 from app.business_logic import (
     AcademicCalculations, ScheduleValidation, PrerequisiteValidation
 )
 
 router = APIRouter(prefix="/api/disciplines", tags=["disciplines"])
-db = Database()
+
+# Rotas que usam o lock do banco (escritas e leituras que o aguardam) são
+# funções síncronas: o FastAPI as executa no threadpool, então uma importação
+# longa segurando o lock não bloqueia o event loop.
+
+# Tamanho dos blocos lidos do upload de CSV
+CSV_CHUNK_SIZE = 64 * 1024
 
 
 @router.get("", response_model=List[Discipline])
-async def list_disciplines():
+def list_disciplines():
     """Lista todas as disciplinas."""
     return db.get_all_disciplines()
 
@@ -34,37 +42,39 @@ async def get_discipline(code: str):
 
 
 @router.post("", response_model=Discipline)
-async def create_discipline(discipline: DisciplineCreate):
+def create_discipline(discipline: DisciplineCreate):
     """Cria uma nova disciplina."""
-    # Verificar se já existe
-    if db.get_discipline(discipline.code):
-        raise HTTPException(status_code=400, detail="Disciplina já existe")
-
     # Validar dados
     valid, errors = discipline_validation(
         discipline.code, discipline.name, discipline.professor,
         discipline.period, discipline.hours
     )
-    if not valid:
-        raise HTTPException(status_code=400, detail="; ".join(errors))
 
-    return db.create_discipline(discipline)
+    with db.lock:
+        # Verificar se já existe
+        if db.get_discipline(discipline.code):
+            raise HTTPException(status_code=400, detail="Disciplina já existe")
+
+        if not valid:
+            raise HTTPException(status_code=400, detail="; ".join(errors))
+
+        return db.create_discipline(discipline)
 
 
 @router.put("/{code}", response_model=Discipline)
-async def update_discipline(code: str, updates: DisciplineUpdate):
+def update_discipline(code: str, updates: DisciplineUpdate):
     """Atualiza uma disciplina."""
     discipline = db.get_discipline(code)
     if not discipline:
         raise HTTPException(status_code=404, detail="Disciplina não encontrada")
 
-    update_data = updates.dict(exclude_unset=True)
+    update_data = updates.model_dump(exclude_unset=True)
     updated = db.update_discipline(code, update_data)
     return updated
 
 
 @router.delete("/{code}")
-async def delete_discipline(code: str):
+def delete_discipline(code: str):
     """Deleta uma disciplina."""
     if not db.delete_discipline(code):
         raise HTTPException(status_code=404, detail="Disciplina não encontrada")
@@ -76,11 +86,12 @@ async def delete_discipline(code: str):
 async def import_csv(file: UploadFile = File(...)):
     """Importa disciplinas de um arquivo CSV."""
     try:
-        content = await file.read()
-        file_content = content.decode('utf-8')
+        chunk = await file.read(CSV_CHUNK_SIZE)
 
-        # Validar formato
-        valid, validation_errors = CSVImporter.validate_csv_format(file_content)
+        # Validar formato (decodificando apenas o header e a primeira linha)
+        valid, validation_errors = CSVImporter.validate_csv_format(
+            CSVImporter.head_bytes(chunk).decode('utf-8', errors='ignore')
+        )
         if not valid:
             return ImportCSVResponse(
                 success=False,
@@ -89,32 +100,85 @@ async def import_csv(file: UploadFile = File(...)):
                 errors=validation_errors
             )
 
-        # Fazer o import
-        disciplines, import_errors = CSVImporter.import_from_file(file_content)
+        # Fazer o import em blocos, sem carregar o arquivo inteiro.
+        # O parsing e a gravação rodam no threadpool para não bloquear o event loop.
+        parser = CSVStreamParser()
+        while chunk:
+            await run_in_threadpool(parser.feed, chunk)
+            chunk = await file.read(CSV_CHUNK_SIZE)
 
-        # Criar as disciplinas
-        count = 0
-        for disc in disciplines:
-            try:
-                if not db.get_discipline(disc.code):
-                    db.create_discipline(disc)
-                    count += 1
-            except Exception as e:
-                import_errors.append(f"Erro ao criar disciplina {disc.code}: {str(e)}")
+        return await run_in_threadpool(_finish_import, parser)
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Erro ao processar arquivo: {str(e)}")
+
+
+@router.post("/import/csv/stream", response_model=ImportCSVResponse)
+async def import_csv_stream(request: Request):
+    """
+    Importa disciplinas de um CSV enviado como corpo da requisição (sem multipart).
+    O parsing começa enquanto o corpo ainda está chegando.
+    """
+    parser = CSVStreamParser()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+    feed_errors = []
+
+    async def consume():
+        # Após um erro, continua esvaziando a fila para não travar o produtor
+        while (chunk := await queue.get()) is not None:
+            if not feed_errors:
+                try:
+                    await run_in_threadpool(parser.feed, chunk)
+                except Exception as e:
+                    feed_errors.append(e)
+
+    worker = asyncio.create_task(consume())
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await queue.put(chunk)
+    finally:
+        await queue.put(None)
+        await worker
 
+    try:
+        if feed_errors:
+            raise feed_errors[0]
+        return await run_in_threadpool(_finish_import, parser)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Erro ao processar arquivo: {str(e)}")
+
+
+def _finish_import(parser: CSVStreamParser) -> ImportCSVResponse:
+    """Finaliza o parsing do CSV e cria as disciplinas importadas."""
+    disciplines_data, parse_errors = parser.close()
+    if parser.header_errors or not parser.row_count:
         return ImportCSVResponse(
-            success=True,
-            imported_count=count,
-            message=f"{count} disciplinas importadas com sucesso",
-            errors=import_errors
+            success=False,
+            imported_count=0,
+            message="Formato de CSV inválido",
+            errors=parser.header_errors or ["Arquivo CSV não contém dados"]
         )
 
+    disciplines, import_errors = CSVImporter.to_disciplines(disciplines_data, parse_errors)
+
+    # Criar as disciplinas em lote (existentes são ignoradas)
+    try:
+        count = db.bulk_create_disciplines(disciplines)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Erro ao processar arquivo: {str(e)}")
+        count = 0
+        import_errors.append(f"Erro ao criar disciplinas: {str(e)}")
+
+    return ImportCSVResponse(
+        success=True,
+        imported_count=count,
+        message=f"{count} disciplinas importadas com sucesso",
+        errors=import_errors
+    )
 
 
 @router.post("/{code}/grades", response_model=FinalExamResponse)
-async def set_grades(code: str, grades: GradesRequest):
+def set_grades(code: str, grades: GradesRequest):
     """Define as notas de uma disciplina e calcula a média."""
     discipline = db.get_discipline(code)
     if not discipline:
@@ -130,11 +194,10 @@ async def set_grades(code: str, grades: GradesRequest):
             grades.n1, grades.n2, grades.n3
         )
 
-        # Salvar notas
-        db.set_grades(code, grades.n1, grades.n2, grades.n3)
-
-        # Atualizar média final
-        db.update_discipline(code, {'media_final': average})
+        # Salvar notas e média final juntas, em uma única gravação
+        with db.batch():
+            db.set_grades(code, grades.n1, grades.n2, grades.n3)
+            db.update_discipline(code, {'media_final': average})
 
         # Verificar se precisa fazer prova final
         final_exam_grade = AcademicCalculations.calculate_final_exam_grade(average)
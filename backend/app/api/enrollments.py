@@ -3,46 +3,51 @@ Rotas da API para gerenciamento de matrículas e semestres.
 """
 
 from fastapi import APIRouter, HTTPException
-from typing import List
+from operator import itemgetter
+from typing import Dict, List
 from app.models import (
     Semester, SemesterCreate, EnrollmentRequest, EnrollmentResponse,
-    ScheduleConflictResponse, PrerequisiteCheckResponse, ProgressResponse
-)
-from app.database import Database
-from app.business_logic import (
-    ScheduleValidation, PrerequisiteValidation, AcademicCalculations
+    ScheduleConflictResponse, PrerequisiteCheckResponse, ProgressResponse,
+    ScheduleEntry
 )
+from app.database import db, without_derived_fields
+from app.business_logic import PrerequisiteValidation
 
 router = APIRouter(prefix="/api", tags=["enrollments"])
-db = Database()
+
+# Rotas que usam o lock do banco (escritas e leituras que o aguardam) são
+# funções síncronas: o FastAPI as executa no threadpool, então uma importação
+# longa segurando o lock não bloqueia o event loop.
+
+# Chave de ordenação para horários fora do formato HH:MM (vão para o fim do dia)
+UNPARSED_START_KEY = 24 * 60
 
 
 # ============ SEMESTRES ============
 
 @router.get("/semesters", response_model=List[Semester])
-async def list_semesters():
+def list_semesters():
     """Lista todos os semestres."""
-    semesters = db.get_all_semesters()
-    result = []
-    for sem in semesters:
-        sem['disciplines'] = db.enrollments.get(sem['code'], [])
-        result.append(sem)
-    return result
+    with db.lock:
+        return [
+            {**sem, 'disciplines': list(db.enrollments.get(sem['code'], ()))}
+            for sem in db.get_all_semesters()
+        ]
 
 
 @router.get("/semesters/{code}", response_model=Semester)
-async def get_semester(code: str):
+def get_semester(code: str):
     """Obtém um semestre específico."""
-    semester = db.get_semester(code)
-    if not semester:
-        raise HTTPException(status_code=404, detail="Semestre não encontrado")
+    with db.lock:
+        semester = db.get_semester(code)
+        if not semester:
+            raise HTTPException(status_code=404, detail="Semestre não encontrado")
 
-    semester['disciplines'] = db.enrollments.get(code, [])
-    return semester
+        return {**semester, 'disciplines': list(db.enrollments.get(code, ()))}
 
 
 @router.post("/semesters", response_model=Semester)
-async def create_semester(semester: SemesterCreate):
+def create_semester(semester: SemesterCreate):
     """Cria um novo semestre."""
     if db.get_semester(semester.code):
         raise HTTPException(status_code=400, detail="Semestre já existe")
@@ -53,75 +58,67 @@ async def create_semester(semester: SemesterCreate):
 # ============ MATRÍCULAS ============
 
 @router.post("/enroll", response_model=EnrollmentResponse)
-async def enroll_discipline(request: EnrollmentRequest):
+def enroll_discipline(request: EnrollmentRequest):
     """Matricula um aluno em uma disciplina."""
-    # Verificar se o semestre existe
-    semester = db.get_semester(request.semester_code)
-    if not semester:
-        raise HTTPException(status_code=404, detail="Semestre não encontrado")
-
-    # Verificar se a disciplina existe
-    discipline = db.get_discipline(request.discipline_code)
-    if not discipline:
-        raise HTTPException(status_code=404, detail="Disciplina não encontrada")
-
-    # Verificar pré-requisitos
-    completed_disciplines = {}
-    for disc in db.get_all_disciplines():
-        if disc.get('media_final') and disc.get('media_final') >= 7.0:
-            completed_disciplines[disc['code']] = disc['media_final']
-
-    prereq_met, missing = PrerequisiteValidation.check_prerequisites(
-        discipline.get('prerequisites', []),
-        completed_disciplines
-    )
-
-    if not prereq_met:
-        missing_names = [db.get_discipline(code)['name'] for code in missing if db.get_discipline(code)]
-        return EnrollmentResponse(
-            success=False,
-            message="Pré-requisitos não atendidos",
-            prerequisite_check=PrerequisiteCheckResponse(
-                prerequisites_met=False,
-                missing_prerequisites=missing_names,
-                message=f"Disciplinas faltando: {', '.join(missing_names)}"
-            )
+    # Leituras e escrita sob o mesmo lock: nada muda entre as verificações e a matrícula
+    with db.lock:
+        context = db.get_enrollment_context(request.semester_code, request.discipline_code)
+
+        # Verificar se o semestre existe
+        if not context.semester:
+            raise HTTPException(status_code=404, detail="Semestre não encontrado")
+
+        # Verificar se a disciplina existe
+        discipline = context.discipline
+        if not discipline:
+            raise HTTPException(status_code=404, detail="Disciplina não encontrada")
+
+        # Verificar pré-requisitos
+        prereq_met, missing = PrerequisiteValidation.check_prerequisites(
+            discipline.get('prerequisites', []),
+            context.completed_disciplines
         )
 
-    # Verificar conflitos de horários
-    enrolled_disciplines = db.get_enrolled_disciplines(request.semester_code)
-    for enrolled_disc in enrolled_disciplines:
-        has_conflict, conflict_info = ScheduleValidation.has_schedule_conflict(
-            discipline.get('schedules', []),
-            enrolled_disc.get('schedules', [])
-        )
+        if not prereq_met:
+            missing_names = [disc['name'] for disc in db.get_disciplines_by_codes(missing).values()]
+            return EnrollmentResponse(
+                success=False,
+                message="Pré-requisitos não atendidos",
+                prerequisite_check=PrerequisiteCheckResponse(
+                    prerequisites_met=False,
+                    missing_prerequisites=missing_names,
+                    message=f"Disciplinas faltando: {', '.join(missing_names)}"
+                )
+            )
 
-        if has_conflict:
+        # Verificar conflitos de horários
+        conflicting_disc = db.find_schedule_conflict(request.semester_code, discipline)
+        if conflicting_disc:
             return EnrollmentResponse(
                 success=False,
                 message="Conflito de horário detectado",
                 schedule_conflict=ScheduleConflictResponse(
                     has_conflict=True,
-                    conflicting_discipline=enrolled_disc['name'],
-                    message=f"Conflito com {enrolled_disc['name']}"
+                    conflicting_discipline=conflicting_disc['name'],
+                    message=f"Conflito com {conflicting_disc['name']}"
                 )
             )
 
-    # Fazer a matrícula
-    if db.enroll_discipline(request.semester_code, request.discipline_code):
-        return EnrollmentResponse(
-            success=True,
-            message="Disciplina matriculada com sucesso"
-        )
-    else:
-        return EnrollmentResponse(
-            success=False,
-            message="Disciplina já matriculada"
-        )
+        # Fazer a matrícula
+        if db.enroll_discipline(request.semester_code, request.discipline_code):
+            return EnrollmentResponse(
+                success=True,
+                message="Disciplina matriculada com sucesso"
+            )
+        else:
+            return EnrollmentResponse(
+                success=False,
+                message="Disciplina já matriculada"
+            )
 
 
 @router.post("/unenroll", response_model=EnrollmentResponse)
-async def unenroll_discipline(request: EnrollmentRequest):
+def unenroll_discipline(request: EnrollmentRequest):
     """Remove matrícula de uma disciplina."""
     if db.unenroll_discipline(request.semester_code, request.discipline_code):
         return EnrollmentResponse(
@@ -136,40 +133,35 @@ async def unenroll_discipline(request: EnrollmentRequest):
 
 
 @router.get("/semesters/{code}/enrolled", response_model=List[dict])
-async def get_enrolled_disciplines(code: str):
+def get_enrolled_disciplines(code: str):
     """Obtém as disciplinas matriculadas em um semestre."""
     semester = db.get_semester(code)
     if not semester:
         raise HTTPException(status_code=404, detail="Semestre não encontrado")
 
-    return db.get_enrolled_disciplines(code)
+    return [without_derived_fields(disc) for disc in db.get_enrolled_disciplines(code)]
+
+
+@router.get("/semesters/{code}/statuses", response_model=Dict[str, str])
+def get_discipline_statuses(code: str):
+    """Obtém o status de cada disciplina do curso em relação a um semestre."""
+    semester = db.get_semester(code)
+    if not semester:
+        raise HTTPException(status_code=404, detail="Semestre não encontrado")
+
+    return db.compute_all_statuses(db.enrollments.get(code, ()))
 
 
 # ============ PROGRESSO ============
 
 @router.get("/progress", response_model=ProgressResponse)
-async def get_progress():
+def get_progress():
     """Obtém o progresso geral do curso."""
-    total_hours = 3210  # Total do curso CCP02
-    completed_hours = db.get_completed_hours()
-    enrolled_count = len(db.enrollments.get('2024.1', []))
-    general_average = db.get_general_average()
-
-    percentage = AcademicCalculations.calculate_course_progress(
-        completed_hours, total_hours
-    )
-
-    return ProgressResponse(
-        total_hours=total_hours,
-        completed_hours=completed_hours,
-        percentage=percentage,
-        enrolled_count=enrolled_count,
-        general_average=general_average
-    )
-
-
-@router.get("/schedule/{semester_code}")
-async def get_schedule(semester_code: str):
+    return ProgressResponse(**db.get_progress('2024.1'))
+
+
+@router.get("/schedule/{semester_code}", response_model=Dict[int, List[ScheduleEntry]])
+def get_schedule(semester_code: str):
     """Obtém o cronograma de aulas de um semestre."""
     semester = db.get_semester(semester_code)
     if not semester:
@@ -183,16 +175,18 @@ async def get_schedule(semester_code: str):
     for discipline in enrolled:
         for schedule_item in discipline.get('schedules', []):
             day = schedule_item['day']
-            schedule[day].append({
+            start_min = schedule_item.get('start_min', UNPARSED_START_KEY)
+            schedule[day].append((start_min, {
                 'discipline_code': discipline['code'],
                 'discipline_name': discipline['name'],
                 'start': schedule_item['start'],
                 'end': schedule_item['end'],
                 'location': schedule_item['location']
-            })
+            }))
 
-    # Ordenar por horário
+    # Ordenar por horário (chave inteira pré-calculada, comparada em C)
     for day in schedule:
-        schedule[day].sort(key=lambda x: x['start'])
+        schedule[day].sort(key=itemgetter(0))
+        schedule[day] = [item for _, item in schedule[day]]
 
     return schedule
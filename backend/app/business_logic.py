@@ -3,9 +3,41 @@ Lógica de negócio para cálculos acadêmicos.
 Implementa as regras específicas da UFRPE e validações.
 """
 
-from typing import List, Dict, Optional, Tuple
+import re
+from functools import lru_cache
+from operator import mul
+from typing import Collection, Final, List, Dict, Optional, Tuple
 from datetime import datetime
 
+# Carga horária total do curso (estrutura CCP02 da UFRPE)
+TOTAL_HOURS_CCP02: Final[int] = 3210
+
+# Granularidade do mapa de ocupação de horários (ver occupancy_mask)
+SLOT_MINUTES: Final[int] = 30
+SLOTS_PER_DAY: Final[int] = 24 * 60 // SLOT_MINUTES
+DAYS_PER_WEEK: Final[int] = 7
+
+# Campos derivados que add_schedule_minutes adiciona a cada horário
+SCHEDULE_MINUTE_KEYS: Final = frozenset(('start_min', 'end_min'))
+
+# Qualquer caractere que não seja espaço em branco
+_NON_WS = re.compile(r'\S')
+
+
+@lru_cache(maxsize=1024)
+def _time_to_minutes(time_str: str) -> int:
+    """
+    Converte uma string de horário (HH:MM) para minutos.
+    Os horários se repetem muito entre disciplinas, então o resultado é memoizado.
+    """
+    try:
+        hours, minutes = map(int, time_str.split(':'))
+        if not (0 <= hours < 24 and 0 <= minutes < 60):
+            raise ValueError(f"Horário inválido: {time_str}")
+        return hours * 60 + minutes
+    except (ValueError, AttributeError):
+        raise ValueError(f"Formato de horário inválido: {time_str}. Use HH:MM")
+
 
 class AcademicCalculations:
     """Classe responsável pelos cálculos acadêmicos."""
@@ -16,17 +48,20 @@ class AcademicCalculations:
         Calcula a média final conforme regra UFRPE.
         A média é a média das duas maiores notas entre N1, N2 e N3.
         """
-        notes = [n1, n2, n3]
-        
         # Validar intervalo
-        for note in notes:
-            if not (0 <= note <= 10):
-                raise ValueError(f"Nota {note} fora do intervalo 0-10")
-        
-        # Ordenar em ordem decrescente e pegar as duas maiores
-        notes.sort(reverse=True)
-        average = (notes[0] + notes[1]) / 2
-        
+        if not (0 <= n1 <= 10 and 0 <= n2 <= 10 and 0 <= n3 <= 10):
+            invalid = next(note for note in (n1, n2, n3) if not (0 <= note <= 10))
+            raise ValueError(f"Nota {invalid} fora do intervalo 0-10")
+
+        # Soma direta das duas maiores notas (descartando a menor)
+        if n1 <= n2 and n1 <= n3:
+            top_two = n2 + n3
+        elif n2 <= n3:
+            top_two = n1 + n3
+        else:
+            top_two = n1 + n2
+        average = top_two / 2
+
         return round(average, 2)
 
     @staticmethod
@@ -35,20 +70,20 @@ class AcademicCalculations:
         Calcula o CR ponderado pela carga horária.
         Fórmula: Σ(Nota * CH) / Σ(CH total)
         """
-        total_weighted_points = 0
-        total_hours = 0
-        
+        medias = []
+        hours = []
         for disc in disciplines_list:
             media = disc.get('media_final')
-            ch = disc.get('hours', 60) # Padrão 60h se não informado
-            
             if media is not None:
-                total_weighted_points += (media * ch)
-                total_hours += ch
-                
+                medias.append(media)
+                hours.append(disc.get('hours', 60))  # Padrão 60h se não informado
+
+        total_hours = sum(hours)
         if total_hours == 0:
             return None
-            
+
+        # Produto escalar feito por builtins em C, sem acumulador em Python
+        total_weighted_points = sum(map(mul, medias, hours))
         return round(total_weighted_points / total_hours, 2)
 
     @staticmethod
@@ -69,7 +104,8 @@ class AcademicCalculations:
         return round(final_grade_needed, 2)
 
     @staticmethod
-    def calculate_course_progress(completed_hours: int, total_hours: int = 3210) -> float:
+    def calculate_course_progress(completed_hours: int,
+                                  total_hours: int = TOTAL_HOURS_CCP02) -> float:
         """
         Calcula o percentual de progresso do curso.
         Total de 3210h conforme estrutura CCP02 da UFRPE.
@@ -91,11 +127,11 @@ class AcademicCalculations:
         """Calcula a média aritmética simples das disciplinas."""
         if not discipline_averages:
             return None
-        
+
         for avg in discipline_averages:
             if not (0 <= avg <= 10):
                 raise ValueError(f"Média {avg} fora do intervalo 0-10")
-        
+
         general_average = sum(discipline_averages) / len(discipline_averages)
         return round(general_average, 2)
 
@@ -106,13 +142,7 @@ class ScheduleValidation:
     @staticmethod
     def time_to_minutes(time_str: str) -> int:
         """Converte uma string de horário (HH:MM) para minutos."""
-        try:
-            hours, minutes = map(int, time_str.split(':'))
-            if not (0 <= hours < 24 and 0 <= minutes < 60):
-                raise ValueError(f"Horário inválido: {time_str}")
-            return hours * 60 + minutes
-        except (ValueError, AttributeError):
-            raise ValueError(f"Formato de horário inválido: {time_str}. Use HH:MM")
+        return _time_to_minutes(time_str)
 
     @staticmethod
     def check_time_overlap(start1: str, end1: str, start2: str, end2: str) -> bool:
@@ -124,22 +154,88 @@ class ScheduleValidation:
         
         return start1_min < end2_min and end1_min > start2_min
 
+    @staticmethod
+    def add_schedule_minutes(schedules: List[Dict]) -> None:
+        """
+        Pré-calcula 'start_min' e 'end_min' em cada horário, para que a
+        verificação de conflitos não precise parsear strings HH:MM.
+        Horários inválidos ficam sem os campos e são parseados sob demanda.
+        """
+        for sch in schedules:
+            try:
+                sch['start_min'] = _time_to_minutes(sch.get('start'))
+                sch['end_min'] = _time_to_minutes(sch.get('end'))
+            except (ValueError, TypeError):
+                sch.pop('start_min', None)
+                sch.pop('end_min', None)
+
+    @staticmethod
+    def strip_schedule_minutes(schedules: List[Dict]) -> List[Dict]:
+        """
+        Retorna cópias dos horários sem os campos calculados por
+        add_schedule_minutes, que não devem ser gravados nem expostos na API.
+        """
+        return [
+            {key: value for key, value in sch.items() if key not in SCHEDULE_MINUTE_KEYS}
+            for sch in schedules
+        ]
+
+    @staticmethod
+    def schedule_minutes(schedule: Dict) -> Tuple[int, int]:
+        """Obtém (início, fim) de um horário em minutos."""
+        start_min = schedule.get('start_min')
+        end_min = schedule.get('end_min')
+        if start_min is None or end_min is None:
+            return _time_to_minutes(schedule.get('start')), _time_to_minutes(schedule.get('end'))
+        return start_min, end_min
+
+    @staticmethod
+    def occupancy_mask(schedules: List[Dict]) -> int:
+        """
+        Representa a ocupação semanal como um inteiro: o bit
+        dia * SLOTS_PER_DAY + slot fica ligado para cada slot de SLOT_MINUTES
+        tocado por algum horário. O início é arredondado para baixo e o fim
+        para cima, então máscaras disjuntas garantem ausência de conflito;
+        máscaras com interseção ainda precisam da verificação exata.
+        Retorna -1 (todos os bits) se algum dia ou horário não puder ser
+        mapeado (dia fora da semana, horário inválido ou intervalo vazio ou
+        invertido, que não ocupa nenhum slot), deixando a decisão para a
+        verificação exata.
+        """
+        mask = 0
+        for sch in schedules:
+            day = sch.get('day')
+            if not isinstance(day, int) or not 0 <= day < DAYS_PER_WEEK:
+                return -1
+            try:
+                start, end = ScheduleValidation.schedule_minutes(sch)
+            except ValueError:
+                return -1
+            if end <= start:
+                return -1
+            first = start // SLOT_MINUTES
+            last = -(-end // SLOT_MINUTES)
+            mask |= ((1 << (last - first)) - 1) << (day * SLOTS_PER_DAY + first)
+        return mask
+
     @staticmethod
     def has_schedule_conflict(discipline1_schedules: List[Dict], 
                              discipline2_schedules: List[Dict]) -> Tuple[bool, Optional[Dict]]:
         """Verifica se há conflito de horários entre duas disciplinas."""
+        intervals2 = [
+            (sch2.get('day'), *ScheduleValidation.schedule_minutes(sch2), sch2)
+            for sch2 in discipline2_schedules
+        ]
         for sch1 in discipline1_schedules:
-            for sch2 in discipline2_schedules:
-                if sch1.get('day') == sch2.get('day'):
-                    if ScheduleValidation.check_time_overlap(
-                        sch1.get('start'), sch1.get('end'),
-                        sch2.get('start'), sch2.get('end')
-                    ):
-                        return True, {
-                            'day': sch1.get('day'),
-                            'time1': f"{sch1.get('start')}-{sch1.get('end')}",
-                            'time2': f"{sch2.get('start')}-{sch2.get('end')}"
-                        }
+            day1 = sch1.get('day')
+            start1, end1 = ScheduleValidation.schedule_minutes(sch1)
+            for day2, start2, end2, sch2 in intervals2:
+                if day1 == day2 and start1 < end2 and end1 > start2:
+                    return True, {
+                        'day': day1,
+                        'time1': f"{sch1.get('start')}-{sch1.get('end')}",
+                        'time2': f"{sch2.get('start')}-{sch2.get('end')}"
+                    }
         return False, None
 
 
@@ -150,22 +246,34 @@ class PrerequisiteValidation:
     def check_prerequisites(discipline_prerequisites: List[str],
                            completed_disciplines: Dict[str, float]) -> Tuple[bool, List[str]]:
         """Verifica se todos os pré-requisitos foram atendidos (média >= 7.0)."""
-        missing = []
-        for prereq_id in discipline_prerequisites:
-            if prereq_id not in completed_disciplines or completed_disciplines[prereq_id] < 7.0:
-                missing.append(prereq_id)
-        return len(missing) == 0, missing
+        missing = [
+            prereq_id for prereq_id in discipline_prerequisites
+            if completed_disciplines.get(prereq_id, -1.0) < 7.0
+        ]
+        return not missing, missing
+
+    @staticmethod
+    def check_prerequisites_fast(discipline_prerequisites: List[str],
+                                 completed_disciplines: Dict[str, float]) -> bool:
+        """
+        Verifica apenas se todos os pré-requisitos foram atendidos,
+        parando no primeiro que faltar.
+        """
+        return all(
+            completed_disciplines.get(prereq_id, -1.0) >= 7.0
+            for prereq_id in discipline_prerequisites
+        )
 
     @staticmethod
     def validate_discipline_status(discipline_id: str,
                                   discipline_prerequisites: List[str],
                                   completed_disciplines: Dict[str, float],
-                                  enrolled_ids: List[str] = []) -> str:
+                                  enrolled_ids: Collection[str] = ()) -> str:
         """
         Determina o status de uma disciplina: 'completed', 'studying', 'available', 'blocked'.
         """
         # 1. Verificar se já foi concluída (incluindo Aproveitamento)
-        if discipline_id in completed_disciplines and completed_disciplines[discipline_id] >= 7.0:
+        if completed_disciplines.get(discipline_id, -1.0) >= 7.0:
             return 'completed'
         
         # 2. Verificar se está sendo cursada no semestre atual
@@ -173,10 +281,10 @@ class PrerequisiteValidation:
             return 'studying'
         
         # 3. Verificar pré-requisitos
-        all_met, _ = PrerequisiteValidation.check_prerequisites(
+        all_met = PrerequisiteValidation.check_prerequisites_fast(
             discipline_prerequisites, completed_disciplines
         )
-        
+
         return 'available' if all_met else 'blocked'
 
 
@@ -185,7 +293,7 @@ class DataValidation:
 
     @staticmethod
     def validate_discipline_code(code: str) -> bool:
-        return bool(code and isinstance(code, str) and len(code.strip()) > 0)
+        return isinstance(code, str) and _NON_WS.search(code) is not None
 
     @staticmethod
     def validate_period(period: int) -> bool:
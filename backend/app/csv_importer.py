@@ -3,26 +3,41 @@ Módulo de importação de CSV.
 Responsável por parsear e validar arquivos CSV de disciplinas.
 """
 
+import codecs
 import csv
 import io
-from typing import List, Dict, Tuple
+import re
+import sys
+from typing import ClassVar, FrozenSet, List, Dict, Optional, Tuple
 from app.models import DisciplineCreate, ScheduleItem
-from app.business_logic import DataValidation
+
+# Horário HH:MM entre 00:00 e 23:59 (a hora também pode ter um só dígito)
+_TIME_RE = re.compile(r'^([01]?\d|2[0-3]):[0-5]\d$')
+
+# Campo entre aspas (só conta como tal no início de um campo, como no csv);
+# o grupo 1 é a aspa de fechamento, vazio se o campo ainda não terminou
+_QUOTED_FIELD_RE = re.compile(r'"(?<![^;\n]")[^"]*(?:""[^"]*)*("?)')
+
+# Faixas válidas de período e dia da semana, verificadas direto no laço de linhas
+_PERIOD_MIN, _PERIOD_MAX = 1, 9
+_DAY_MIN, _DAY_MAX = 1, 5  # 1=Segunda ... 5=Sexta
 
 
 class CSVImporter:
     """Classe responsável pela importação de arquivos CSV."""
 
     # Formato esperado do CSV
-    EXPECTED_HEADERS = [
+    EXPECTED_HEADERS: ClassVar[List[str]] = [
         'Código', 'Nome', 'Professor', 'Período', 'Local', 
         'Dia', 'Início', 'Fim', 'Pré-requisitos'
     ]
+    EXPECTED_HEADER_SET: ClassVar[FrozenSet[str]] = frozenset(EXPECTED_HEADERS)
 
     @staticmethod
     def parse_csv(file_content: str) -> Tuple[List[Dict], List[str]]:
         """
-        Faz o parsing de um arquivo CSV.
+        Faz o parsing de um arquivo CSV já decodificado.
+        Mantido por compatibilidade; ver parse_csv_bytes.
 
         Args:
             file_content: Conteúdo do arquivo CSV como string
@@ -30,145 +45,161 @@ class CSVImporter:
         Returns:
             Tuple[List[Dict], List[str]]: (disciplinas_agrupadas, erros)
         """
-        errors = []
-        disciplines_map = {}
-
         try:
-            # Usar StringIO para simular um arquivo
-            csv_file = io.StringIO(file_content)
-            reader = csv.DictReader(csv_file, delimiter=';')
+            file_bytes = file_content.encode('utf-8')
+        except UnicodeEncodeError as e:
+            return [], [f"Erro ao ler arquivo CSV: {str(e)}"]
 
-            if not reader.fieldnames:
-                errors.append("Arquivo CSV vazio ou inválido")
-                return [], errors
+        return CSVImporter.parse_csv_bytes(file_bytes)
 
-            # Validar headers
-            expected_headers = set(CSVImporter.EXPECTED_HEADERS)
-            actual_headers = set(reader.fieldnames) if reader.fieldnames else set()
+    @staticmethod
+    def parse_csv_bytes(file_bytes: bytes) -> Tuple[List[Dict], List[str]]:
+        """
+        Faz o parsing de um arquivo CSV a partir dos bytes do upload,
+        decodificando o UTF-8 dentro do próprio parser.
 
-            if not expected_headers.issubset(actual_headers):
-                missing = expected_headers - actual_headers
-                errors.append(f"Headers faltando: {', '.join(missing)}")
-                return [], errors
-
-            # Processar linhas
-            for row_num, row in enumerate(reader, start=2):  # Começa em 2 (header é 1)
-                try:
-                    # Validar e limpar dados
-                    code = row.get('Código', '').strip()
-                    name = row.get('Nome', '').strip()
-                    professor = row.get('Professor', '').strip()
-                    period_str = row.get('Período', '').strip()
-                    location = row.get('Local', '').strip()
-                    day_str = row.get('Dia', '').strip()
-                    start_time = row.get('Início', '').strip()
-                    end_time = row.get('Fim', '').strip()
-                    prerequisites_str = row.get('Pré-requisitos', '').strip()
-
-                    # Validações básicas
-                    if not code:
-                        errors.append(f"Linha {row_num}: Código vazio")
-                        continue
-
-                    if not name:
-                        errors.append(f"Linha {row_num}: Nome vazio")
-                        continue
-
-                    if not professor:
-                        errors.append(f"Linha {row_num}: Professor vazio")
-                        continue
-
-                    # Converter e validar período
-                    try:
-                        period = int(period_str)
-                        if not DataValidation.validate_period(period):
-                            errors.append(f"Linha {row_num}: Período {period} inválido (deve ser 1-9)")
-                            continue
-                    except ValueError:
-                        errors.append(f"Linha {row_num}: Período '{period_str}' não é um número")
-                        continue
-
-                    # Converter e validar dia
-                    try:
-                        day = int(day_str)
-                        if not DataValidation.validate_day_of_week(day):
-                            errors.append(f"Linha {row_num}: Dia {day} inválido (deve ser 1-5)")
-                            continue
-                    except ValueError:
-                        errors.append(f"Linha {row_num}: Dia '{day_str}' não é um número")
-                        continue
-
-                    # Validar formato de horário
-                    if not CSVImporter._validate_time_format(start_time):
-                        errors.append(f"Linha {row_num}: Horário de início '{start_time}' inválido (use HH:MM)")
-                        continue
-
-                    if not CSVImporter._validate_time_format(end_time):
-                        errors.append(f"Linha {row_num}: Horário de término '{end_time}' inválido (use HH:MM)")
-                        continue
-
-                    # Parsear pré-requisitos
-                    prerequisites = []
-                    if prerequisites_str:
-                        prerequisites = [p.strip() for p in prerequisites_str.split(',') if p.strip()]
-
-                    # Agrupar por código (mesma disciplina pode ter múltiplos horários)
-                    if code not in disciplines_map:
-                        disciplines_map[code] = {
-                            'code': code,
-                            'name': name,
-                            'professor': professor,
-                            'period': period,
-                            'hours': 60,  # Padrão
-                            'schedules': [],
-                            'prerequisites': prerequisites
-                        }
-
-                    # Adicionar horário
-                    schedule = {
-                        'day': day,
-                        'start': start_time,
-                        'end': end_time,
-                        'location': location
-                    }
-                    disciplines_map[code]['schedules'].append(schedule)
-
-                except Exception as e:
-                    errors.append(f"Linha {row_num}: Erro ao processar - {str(e)}")
-                    continue
+        Args:
+            file_bytes: Conteúdo do arquivo CSV em bytes (UTF-8)
 
+        Returns:
+            Tuple[List[Dict], List[str]]: (disciplinas_agrupadas, erros)
+        """
+        parser = CSVStreamParser()
+        try:
+            parser.feed(file_bytes)
         except Exception as e:
-            errors.append(f"Erro ao ler arquivo CSV: {str(e)}")
-            return [], errors
+            return [], [f"Erro ao ler arquivo CSV: {str(e)}"]
 
-        # Converter para lista
-        disciplines = list(disciplines_map.values())
+        return parser.close()
 
-        return disciplines, errors
+    @staticmethod
+    def check_headers(fieldnames: Optional[List[str]]) -> List[str]:
+        """
+        Verifica se o header contém todas as colunas esperadas.
+
+        Args:
+            fieldnames: Colunas lidas do header do CSV
+
+        Returns:
+            List[str]: Erros encontrados (vazia se o header for válido)
+        """
+        if not fieldnames:
+            return ["Arquivo CSV vazio ou inválido"]
+
+        expected_headers = CSVImporter.EXPECTED_HEADER_SET
+        actual_headers = set(fieldnames)
+
+        if not expected_headers.issubset(actual_headers):
+            missing = expected_headers - actual_headers
+            return [f"Headers faltando: {', '.join(missing)}"]
+
+        return []
+
+    @staticmethod
+    def column_indices(fieldnames: List[str]) -> List[int]:
+        """
+        Resolve a posição de cada coluna esperada no header (uma vez por arquivo).
+
+        Args:
+            fieldnames: Colunas lidas do header do CSV (já validadas)
+
+        Returns:
+            List[int]: Índice de cada coluna, na ordem de EXPECTED_HEADERS
+        """
+        return [fieldnames.index(h) for h in CSVImporter.EXPECTED_HEADERS]
 
     @staticmethod
-    def _validate_time_format(time_str: str) -> bool:
+    def parse_row(row: List[str], col: List[int], row_num: int,
+                  min_len: Optional[int] = None) -> Tuple[Optional[Dict], Optional[str]]:
         """
-        Valida se uma string está no formato HH:MM.
+        Valida e converte uma linha do CSV.
 
         Args:
-            time_str: String de horário
+            row: Campos da linha, como retornados por csv.reader
+            col: Posição de cada coluna (ver column_indices)
+            row_num: Número da linha no arquivo (para mensagens de erro)
+            min_len: Quantidade mínima de campos (calculada a partir de col
+                se não for informada)
 
         Returns:
-            bool: True se válido, False caso contrário
+            Tuple[Optional[Dict], Optional[str]]: (dados_da_linha, erro)
         """
-        if not time_str or ':' not in time_str:
-            return False
+        if min_len is None:
+            min_len = max(col) + 1
+        if len(row) < min_len:
+            return None, f"Linha {row_num}: colunas insuficientes"
 
         try:
-            parts = time_str.split(':')
-            if len(parts) != 2:
-                return False
+            # Validar e limpar dados
+            # Mesma ordem de EXPECTED_HEADERS
+            (c_code, c_name, c_professor, c_period, c_location,
+             c_day, c_start, c_end, c_prerequisites) = col
+
+            code = row[c_code].strip()
+            name = row[c_name].strip()
+            professor = row[c_professor].strip()
+            period_str = row[c_period].strip()
+            location = row[c_location].strip()
+            day_str = row[c_day].strip()
+            start_time = row[c_start].strip()
+            end_time = row[c_end].strip()
+            prerequisites_str = row[c_prerequisites].strip()
+
+            # Validações básicas
+            if not code:
+                return None, f"Linha {row_num}: Código vazio"
+
+            if not name:
+                return None, f"Linha {row_num}: Nome vazio"
+
+            if not professor:
+                return None, f"Linha {row_num}: Professor vazio"
+
+            # Converter e validar período
+            try:
+                period = int(period_str)
+                if not _PERIOD_MIN <= period <= _PERIOD_MAX:
+                    return None, f"Linha {row_num}: Período {period} inválido (deve ser 1-9)"
+            except ValueError:
+                return None, f"Linha {row_num}: Período '{period_str}' não é um número"
+
+            # Converter e validar dia
+            try:
+                day = int(day_str)
+                if not _DAY_MIN <= day <= _DAY_MAX:
+                    return None, f"Linha {row_num}: Dia {day} inválido (deve ser 1-5)"
+            except ValueError:
+                return None, f"Linha {row_num}: Dia '{day_str}' não é um número"
+
+            # Validar formato de horário
+            match_time = _TIME_RE.fullmatch
+            if not (start_time and match_time(start_time)):
+                return None, f"Linha {row_num}: Horário de início '{start_time}' inválido (use HH:MM)"
 
-            hours, minutes = int(parts[0]), int(parts[1])
-            return 0 <= hours < 24 and 0 <= minutes < 60
-        except (ValueError, AttributeError):
-            return False
+            if not (end_time and match_time(end_time)):
+                return None, f"Linha {row_num}: Horário de término '{end_time}' inválido (use HH:MM)"
+
+            # Parsear pré-requisitos
+            prerequisites = []
+            if prerequisites_str:
+                prerequisites = list(filter(None, map(str.strip, prerequisites_str.split(','))))
+
+        except Exception as e:
+            return None, f"Linha {row_num}: Erro ao processar - {str(e)}"
+
+        return {
+            'code': code,
+            'name': name,
+            'professor': sys.intern(professor),
+            'period': period,
+            'prerequisites': prerequisites,
+            'schedule': {
+                'day': day,
+                'start': sys.intern(start_time),
+                'end': sys.intern(end_time),
+                'location': sys.intern(location)
+            }
+        }, None
 
     @staticmethod
     def import_from_file(file_content: str) -> Tuple[List[DisciplineCreate], List[str]]:
@@ -182,13 +213,28 @@ class CSVImporter:
             Tuple[List[DisciplineCreate], List[str]]: (disciplinas, erros)
         """
         disciplines_data, errors = CSVImporter.parse_csv(file_content)
+        return CSVImporter.to_disciplines(disciplines_data, errors)
 
-        # Converter para DisciplineCreate
+    @staticmethod
+    def to_disciplines(disciplines_data: List[Dict],
+                       errors: List[str]) -> Tuple[List[DisciplineCreate], List[str]]:
+        """
+        Converte as disciplinas agrupadas pelo parser em DisciplineCreate.
+
+        Args:
+            disciplines_data: Disciplinas agrupadas por código
+            errors: Erros acumulados no parsing (novos erros são adicionados)
+
+        Returns:
+            Tuple[List[DisciplineCreate], List[str]]: (disciplinas, erros)
+        """
+        # Os campos já foram validados linha a linha pelo parser, então os
+        # modelos são montados com model_construct, sem validar de novo
         disciplines = []
         for disc_data in disciplines_data:
             try:
                 schedules = [
-                    ScheduleItem(
+                    ScheduleItem.model_construct(
                         day=sch['day'],
                         start=sch['start'],
                         end=sch['end'],
@@ -197,7 +243,7 @@ class CSVImporter:
                     for sch in disc_data.get('schedules', [])
                 ]
 
-                discipline = DisciplineCreate(
+                discipline = DisciplineCreate.model_construct(
                     code=disc_data['code'],
                     name=disc_data['name'],
                     professor=disc_data['professor'],
@@ -212,13 +258,35 @@ class CSVImporter:
 
         return disciplines, errors
 
+    @staticmethod
+    def head_bytes(data: bytes) -> bytes:
+        """
+        Recorta o início de um bloco do arquivo até o fim da primeira linha
+        de dados não vazia, sem decodificar o restante. O corte é feito
+        direto nos bytes de quebra de linha (ASCII em UTF-8).
+
+        Args:
+            data: Bloco inicial do arquivo CSV
+
+        Returns:
+            bytes: Header e primeira linha de dados (ou o bloco inteiro)
+        """
+        end = data.find(b'\n')  # Fim do header
+        while end != -1:
+            next_end = data.find(b'\n', end + 1)
+            if data[end + 1:next_end if next_end != -1 else len(data)].strip():
+                return data if next_end == -1 else data[:next_end + 1]
+            end = next_end
+        return data
+
     @staticmethod
     def validate_csv_format(file_content: str) -> Tuple[bool, List[str]]:
         """
         Valida o formato de um arquivo CSV sem fazer o parsing completo.
+        Basta o trecho inicial do arquivo (header e primeira linha de dados).
 
         Args:
-            file_content: Conteúdo do arquivo CSV
+            file_content: Conteúdo (ou trecho inicial) do arquivo CSV
 
         Returns:
             Tuple[bool, List[str]]: (válido, erros)
@@ -233,7 +301,7 @@ class CSVImporter:
                 errors.append("Arquivo CSV vazio")
                 return False, errors
 
-            expected_headers = set(CSVImporter.EXPECTED_HEADERS)
+            expected_headers = CSVImporter.EXPECTED_HEADER_SET
             actual_headers = set(reader.fieldnames)
 
             if not expected_headers.issubset(actual_headers):
@@ -242,7 +310,7 @@ class CSVImporter:
                 return False, errors
 
             # Verificar se há pelo menos uma linha de dados
-            if not any(reader):
+            if next(reader, None) is None:
                 errors.append("Arquivo CSV não contém dados")
                 return False, errors
 
@@ -251,3 +319,135 @@ class CSVImporter:
             return False, errors
 
         return True, errors
+
+
+class CSVStreamParser:
+    """
+    Parser incremental de CSV.
+
+    Recebe o arquivo em blocos, decodifica o UTF-8 de forma incremental e
+    processa apenas as linhas completas de cada bloco, guardando o restante
+    para o próximo. Assim o arquivo nunca é materializado inteiro em memória.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._pending = ''
+        self._scan_from = 0  # Onde retomar a busca por aspas em _pending
+        self._fieldnames: Optional[List[str]] = None
+        self._col: List[int] = []
+        self._min_len = 0  # Campos necessários para alcançar todas as colunas
+        self._row_num = 1  # Header é a linha 1
+        self.disciplines_map: Dict[str, Dict] = {}
+        self.errors: List[str] = []
+        self.header_errors: List[str] = []
+
+    @property
+    def row_count(self) -> int:
+        """Quantidade de linhas de dados lidas até agora."""
+        return self._row_num - 1
+
+    def feed(self, chunk: bytes) -> None:
+        """Processa um bloco de bytes do arquivo."""
+        self.feed_text(self._decoder.decode(chunk))
+
+    def feed_text(self, text: str) -> None:
+        """Processa um bloco de texto já decodificado."""
+        if self.header_errors:
+            return
+
+        buffer = self._pending + text
+
+        # Um campo entre aspas pode conter quebras de linha: o bloco só é
+        # cortado na última quebra de linha fora de aspas. O trecho antes de
+        # _scan_from já foi verificado e não tem quebras fora de aspas.
+        last_newline = -1
+        open_at = -1
+        pos = self._scan_from
+        while (match := _QUOTED_FIELD_RE.search(buffer, pos)) is not None:
+            last_newline = max(last_newline, buffer.rfind('\n', pos, match.start()))
+            # Aspa no fim do bloco pode ser a primeira de um "" escapado
+            if not match.group(1) or match.end() == len(buffer):
+                open_at = match.start()
+                break
+            pos = match.end()
+        else:
+            last_newline = max(last_newline, buffer.rfind('\n', pos))
+
+        cut = last_newline + 1
+        self._pending = buffer[cut:]
+        self._scan_from = (open_at if open_at >= 0 else len(buffer)) - cut
+        if cut:
+            self._process_lines(buffer[:cut])
+
+    def close(self) -> Tuple[List[Dict], List[str]]:
+        """
+        Finaliza o parsing, processando o trecho final do arquivo.
+
+        Returns:
+            Tuple[List[Dict], List[str]]: (disciplinas_agrupadas, erros)
+        """
+        try:
+            self.feed_text(self._decoder.decode(b'', final=True))
+            if self._pending and not self.header_errors:
+                self._process_lines(self._pending)
+                self._pending = ''
+            if self._fieldnames is None and not self.header_errors:
+                self.header_errors = CSVImporter.check_headers(None)
+        except Exception as e:
+            return [], [f"Erro ao ler arquivo CSV: {str(e)}"]
+
+        if self.header_errors:
+            return [], list(self.header_errors)
+
+        # Converter para lista
+        return list(self.disciplines_map.values()), self.errors
+
+    def _process_lines(self, lines: str) -> None:
+        """Processa um trecho contendo apenas linhas completas."""
+        csv_file = io.StringIO(lines)
+
+        reader = csv.reader(csv_file, delimiter=';')
+
+        if self._fieldnames is None:
+            self._fieldnames = next(reader, [])
+            self.header_errors = CSVImporter.check_headers(self._fieldnames)
+            if self.header_errors:
+                return
+            self._col = CSVImporter.column_indices(self._fieldnames)
+            self._min_len = max(self._col) + 1
+
+        # Referências locais usadas a cada linha
+        parse_row = CSVImporter.parse_row
+        errors_append = self.errors.append
+        col = self._col
+        min_len = self._min_len
+        disciplines_map = self.disciplines_map
+        disciplines_map_get = disciplines_map.get
+
+        for row in reader:
+            if not row:  # Linhas em branco são ignoradas
+                continue
+            self._row_num += 1
+            row_data, error = parse_row(row, col, self._row_num, min_len)
+            if row_data is None:
+                if error:
+                    errors_append(error)
+                continue
+
+            # Agrupar por código (mesma disciplina pode ter múltiplos horários)
+            code = row_data['code']
+            entry = disciplines_map_get(code)
+            if entry is None:
+                entry = disciplines_map[code] = {
+                    'code': code,
+                    'name': row_data['name'],
+                    'professor': row_data['professor'],
+                    'period': row_data['period'],
+                    'hours': 60,  # Padrão
+                    'schedules': [],
+                    'prerequisites': row_data['prerequisites']
+                }
+
+            # Adicionar horário
+            entry['schedules'].append(row_data['schedule'])
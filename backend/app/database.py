@@ -5,8 +5,117 @@ Simula um banco de dados em memória com persistência em JSON.
 
 import json
 import os
-from typing import Dict, List, Optional
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from app.models import Discipline, Semester, DisciplineCreate, SemesterCreate
+from app.business_logic import (
+    ScheduleValidation, PrerequisiteValidation, AcademicCalculations, TOTAL_HOURS_CCP02
+)
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele, usa-se o json da biblioteca padrão
+    orjson = None
+
+# Validade (em segundos) do cache de progresso
+PROGRESS_CACHE_TTL = 5.0
+
+
+def _dump_json(data) -> bytes:
+    """Serializa para JSON indentado, em UTF-8."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _load_json(raw: bytes):
+    """Desserializa JSON a partir de bytes UTF-8."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """
+    Grava o arquivo em um temporário no mesmo diretório e o move para o
+    destino com os.replace, que é atômico: uma falha no meio da escrita
+    nunca deixa o arquivo de dados truncado.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp cria o arquivo com permissão 0600; manter a do original
+        mode = os.stat(path).st_mode if os.path.exists(path) else 0o644
+        os.chmod(tmp_path, mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def without_derived_fields(discipline: Dict) -> Dict:
+    """
+    Cópia rasa de uma disciplina sem os campos de horário calculados em
+    memória (ver ScheduleValidation.add_schedule_minutes).
+    """
+    if 'schedules' not in discipline:
+        return discipline
+    return {
+        **discipline,
+        'schedules': ScheduleValidation.strip_schedule_minutes(discipline['schedules'])
+    }
+
+
+def _intern_strings(discipline: Dict) -> None:
+    """
+    Interna as strings que se repetem entre disciplinas (professor, local e
+    horários), para que cada valor exista uma única vez em memória.
+    """
+    professor = discipline.get('professor')
+    if isinstance(professor, str):
+        discipline['professor'] = sys.intern(professor)
+    for sch in discipline.get('schedules', []):
+        for key in ('location', 'start', 'end'):
+            value = sch.get(key)
+            if isinstance(value, str):
+                sch[key] = sys.intern(value)
+
+
+def _synchronized(method):
+    """
+    Executa uma operação de escrita segurando o lock do banco de dados
+    e descarta os caches de progresso e de estatísticas, que podem ter
+    ficado desatualizados.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._progress_cache.clear()
+                self._stats_dirty = True
+    return wrapper
+
+
+@dataclass
+class EnrollmentContext:
+    """
+    Dados necessários para validar uma matrícula. São referências aos dados
+    do banco (não cópias): ficam consistentes enquanto o lock for mantido.
+    """
+    semester: Optional[Dict]
+    discipline: Optional[Dict]
+    completed_disciplines: Dict[str, float]
 
 
 class Database:
@@ -27,10 +136,45 @@ class Database:
         # Criar diretório se não existir
         os.makedirs(data_dir, exist_ok=True)
 
+        # Lock para operações de escrita (e sequências leitura-escrita nas rotas)
+        self.lock = threading.RLock()
+
+        # Arquivos com alterações ainda não salvas e se cada escrita salva na hora
+        self._dirty: Set[str] = set()
+        self._autosave = True
+
         # Dados em memória
         self.disciplines: Dict[str, Dict] = {}
         self.semesters: Dict[str, Dict] = {}
-        self.enrollments: Dict[str, List[str]] = {}  # {semester_code: [discipline_codes]}
+        # {semester_code: {discipline_code: None}}: dict em vez de lista para
+        # pertinência O(1), mantendo a ordem de matrícula (lista no JSON)
+        self.enrollments: Dict[str, Dict[str, None]] = {}
+
+        # Índice reverso das matrículas: {discipline_code: {semester_codes}}
+        self._discipline_to_semesters: Dict[str, Set[str]] = defaultdict(set)
+
+        # {código: média} das disciplinas concluídas (média >= 7.0),
+        # mantido a cada alteração de disciplina ou nota
+        self.completed_disciplines: Dict[str, float] = {}
+        self._completed_hours: Dict[str, int] = {}  # Carga horária de cada concluída
+        self.completed_hours_total = 0
+
+        # Cache de progresso por semestre: {semester_code: (instante, progresso)}
+        self._progress_cache: Dict[str, Tuple[float, Dict]] = {}
+
+        # Agregados sobre as disciplinas (total de horas e média geral),
+        # recalculados em uma única passada quando _stats_dirty
+        self._stats_cache: Dict[str, Any] = {}
+        self._stats_dirty = True
+
+        # Índice de horários matriculados por semestre:
+        # {semester_code: {dia: [(início_min, fim_min, discipline_code)] ordenada}}
+        self._schedule_index: Dict[str, Dict[int, List[Tuple[int, int, str]]]] = {}
+
+        # Mapas de ocupação (ver ScheduleValidation.occupancy_mask): por
+        # disciplina e, por semestre, o OR das disciplinas matriculadas
+        self._occupancy: Dict[str, int] = {}
+        self._semester_occupancy: Dict[str, int] = {}
 
         # Carregar dados
         self._load_data()
@@ -39,43 +183,90 @@ class Database:
         if not self.disciplines:
             self._initialize_default_data()
 
+        self._rebuild_completed()
+
+        for semester_code, codes in self.enrollments.items():
+            for code in codes:
+                self._discipline_to_semesters[code].add(semester_code)
+
     def _load_data(self):
         """Carrega dados dos arquivos JSON."""
         if os.path.exists(self.disciplines_file):
             try:
-                with open(self.disciplines_file, 'r', encoding='utf-8') as f:
-                    self.disciplines = json.load(f)
+                with open(self.disciplines_file, 'rb') as f:
+                    self.disciplines = _load_json(f.read())
+                for disc in self.disciplines.values():
+                    _intern_strings(disc)
+                    ScheduleValidation.add_schedule_minutes(disc.get('schedules', []))
             except Exception as e:
                 print(f"Erro ao carregar disciplinas: {e}")
 
         if os.path.exists(self.semesters_file):
             try:
-                with open(self.semesters_file, 'r', encoding='utf-8') as f:
-                    self.semesters = json.load(f)
+                with open(self.semesters_file, 'rb') as f:
+                    self.semesters = _load_json(f.read())
             except Exception as e:
                 print(f"Erro ao carregar semestres: {e}")
 
         if os.path.exists(self.enrollments_file):
             try:
-                with open(self.enrollments_file, 'r', encoding='utf-8') as f:
-                    self.enrollments = json.load(f)
+                with open(self.enrollments_file, 'rb') as f:
+                    self.enrollments = {
+                        semester_code: dict.fromkeys(codes)
+                        for semester_code, codes in _load_json(f.read()).items()
+                    }
             except Exception as e:
                 print(f"Erro ao carregar matrículas: {e}")
 
     def _save_data(self):
-        """Salva dados nos arquivos JSON."""
+        """Salva nos arquivos JSON os dados alterados desde o último salvamento."""
+        # {nome: (arquivo, função que monta o conteúdo serializável)}
+        files = {
+            'disciplines': (self.disciplines_file, lambda: {
+                code: without_derived_fields(disc)
+                for code, disc in self.disciplines.items()
+            }),
+            'semesters': (self.semesters_file, lambda: self.semesters),
+            'enrollments': (self.enrollments_file, lambda: {
+                semester_code: list(codes)
+                for semester_code, codes in self.enrollments.items()
+            }),
+        }
         try:
-            with open(self.disciplines_file, 'w', encoding='utf-8') as f:
-                json.dump(self.disciplines, f, ensure_ascii=False, indent=2)
-
-            with open(self.semesters_file, 'w', encoding='utf-8') as f:
-                json.dump(self.semesters, f, ensure_ascii=False, indent=2)
-
-            with open(self.enrollments_file, 'w', encoding='utf-8') as f:
-                json.dump(self.enrollments, f, ensure_ascii=False, indent=2)
+            for name, (path, get_data) in files.items():
+                if name in self._dirty:
+                    _atomic_write(path, _dump_json(get_data()))
+                    self._dirty.discard(name)
         except Exception as e:
             print(f"Erro ao salvar dados: {e}")
 
+    def _persist(self, *names: str):
+        """Marca os arquivos como alterados e salva, exceto dentro de um batch()."""
+        self._dirty.update(names)
+        if self._autosave:
+            self._save_data()
+
+    def flush(self):
+        """Salva imediatamente todas as alterações pendentes."""
+        with self.lock:
+            self._save_data()
+
+    @contextmanager
+    def batch(self):
+        """
+        Agrupa várias escritas: nada é salvo dentro do bloco e as alterações
+        são gravadas de uma vez ao sair. O lock fica retido durante o bloco.
+        """
+        with self.lock:
+            previous = self._autosave
+            self._autosave = False
+            try:
+                yield self
+            finally:
+                self._autosave = previous
+                if previous:
+                    self._save_data()
+
     def _initialize_default_data(self):
         """Inicializa com dados de exemplo do curso CCP02."""
         # Disciplinas do 1º nível
@@ -184,6 +375,7 @@ class Database:
 
         # Adicionar disciplinas
         for disc in level1_disciplines + level2_disciplines:
+            ScheduleValidation.add_schedule_minutes(disc['schedules'])
             self.disciplines[disc['code']] = disc
 
         # Criar semestres
@@ -197,10 +389,10 @@ class Database:
         }
 
         # Inicializar matrículas
-        self.enrollments['2024.1'] = []
-        self.enrollments['2024.2'] = []
+        self.enrollments['2024.1'] = {}
+        self.enrollments['2024.2'] = {}
 
-        self._save_data()
+        self._persist('disciplines', 'semesters', 'enrollments')
 
     # ============ DISCIPLINAS ============
 
@@ -209,47 +401,117 @@ class Database:
         return self.disciplines.get(code)
 
     def get_all_disciplines(self) -> List[Dict]:
-        """Obtém todas as disciplinas."""
-        return list(self.disciplines.values())
+        """Obtém todas as disciplinas (cópia rasa da lista, tirada sob o lock)."""
+        with self.lock:
+            return list(self.disciplines.values())
+
+    def get_disciplines_by_codes(self, codes: List[str]) -> Dict[str, Dict]:
+        """Obtém as disciplinas existentes dentre os códigos informados."""
+        return {code: self.disciplines[code] for code in codes if code in self.disciplines}
+
+    def compute_all_statuses(self, enrolled_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Calcula o status de todas as disciplinas em uma única passada:
+        'completed', 'studying', 'available' ou 'blocked'.
+        """
+        # Cópias sob o lock: uma escrita concorrente não altera os dicts durante a iteração
+        with self.lock:
+            items = list(self.disciplines.items())
+            enrolled = set(enrolled_ids)
+            completed = dict(self.completed_disciplines)
+        return {
+            code: PrerequisiteValidation.validate_discipline_status(
+                code, disc.get('prerequisites', []), completed, enrolled
+            )
+            for code, disc in items
+        }
 
+    def _iter_code_and_media(self) -> Iterator[Tuple[str, Optional[float]]]:
+        """Itera (código, média final) direto dos dicts internos, sem montar modelos."""
+        for code, disc in self.disciplines.items():
+            yield code, disc.get('media_final')
+
+    def _rebuild_completed(self):
+        """Reconstrói do zero as disciplinas e horas concluídas."""
+        self.completed_disciplines = {
+            code: media for code, media in self._iter_code_and_media()
+            if media is not None and media >= 7.0
+        }
+        self._completed_hours = {
+            code: self.disciplines[code].get('hours', 0) for code in self.completed_disciplines
+        }
+        self.completed_hours_total = sum(self._completed_hours.values())
+
+    def _update_completed(self, code: str):
+        """Atualiza a situação de conclusão e as horas concluídas de uma disciplina."""
+        self.completed_hours_total -= self._completed_hours.pop(code, 0)
+
+        disc = self.disciplines.get(code)
+        media = disc.get('media_final') if disc else None
+        if media and media >= 7.0:
+            self.completed_disciplines[code] = media
+            hours = disc.get('hours', 0)
+            self._completed_hours[code] = hours
+            self.completed_hours_total += hours
+        else:
+            self.completed_disciplines.pop(code, None)
+
+    @_synchronized
     def create_discipline(self, discipline: DisciplineCreate) -> Dict:
         """Cria uma nova disciplina."""
-        disc_data = discipline.dict()
+        disc_data = discipline.model_dump()
+        ScheduleValidation.add_schedule_minutes(disc_data['schedules'])
         self.disciplines[discipline.code] = disc_data
-        self._save_data()
+        self._update_completed(discipline.code)
+        # O código pode já constar em matrículas (e nos caches, como vazio)
+        self._clear_schedule_caches(discipline.code)
+        self._persist('disciplines')
         return disc_data
 
+    @_synchronized
     def update_discipline(self, code: str, updates: Dict) -> Optional[Dict]:
         """Atualiza uma disciplina."""
         if code not in self.disciplines:
             return None
 
+        if 'schedules' in updates:
+            ScheduleValidation.add_schedule_minutes(updates['schedules'] or [])
+            self._clear_schedule_caches(code)
         self.disciplines[code].update(updates)
-        self._save_data()
+        if 'media_final' in updates or 'hours' in updates:
+            self._update_completed(code)
+        self._persist('disciplines')
         return self.disciplines[code]
 
+    @_synchronized
     def delete_discipline(self, code: str) -> bool:
         """Deleta uma disciplina."""
         if code not in self.disciplines:
             return False
 
         del self.disciplines[code]
+        self._update_completed(code)
+        self._clear_schedule_caches(code)
 
-        # Remover de todas as matrículas
-        for semester_code in self.enrollments:
-            if code in self.enrollments[semester_code]:
-                self.enrollments[semester_code].remove(code)
+        # Remover das matrículas (apenas dos semestres que a contêm)
+        for semester_code in self._discipline_to_semesters.pop(code, ()):
+            del self.enrollments[semester_code][code]
 
-        self._save_data()
+        self._persist('disciplines', 'enrollments')
         return True
 
+    @_synchronized
     def bulk_create_disciplines(self, disciplines: List[DisciplineCreate]) -> int:
-        """Cria múltiplas disciplinas de uma vez."""
+        """
+        Cria múltiplas disciplinas de uma vez, salvando os dados uma única vez.
+        Disciplinas já existentes (ou repetidas na lista) são ignoradas.
+        """
         count = 0
-        for disc in disciplines:
-            if disc.code not in self.disciplines:
-                self.create_discipline(disc)
-                count += 1
+        with self.batch():
+            for disc in disciplines:
+                if disc.code not in self.disciplines:
+                    self.create_discipline(disc)
+                    count += 1
 
         return count
 
@@ -260,36 +522,53 @@ class Database:
         return self.semesters.get(code)
 
     def get_all_semesters(self) -> List[Dict]:
-        """Obtém todos os semestres."""
-        return list(self.semesters.values())
+        """Obtém todos os semestres (cópia rasa da lista, tirada sob o lock)."""
+        with self.lock:
+            return list(self.semesters.values())
 
+    @_synchronized
     def create_semester(self, semester: SemesterCreate) -> Dict:
         """Cria um novo semestre."""
-        sem_data = semester.dict()
+        sem_data = semester.model_dump()
         self.semesters[semester.code] = sem_data
-        self.enrollments[semester.code] = []
-        self._save_data()
+        self.enrollments[semester.code] = {}
+        self._persist('semesters', 'enrollments')
         return sem_data
 
+    @_synchronized
     def update_semester(self, code: str, updates: Dict) -> Optional[Dict]:
         """Atualiza um semestre."""
         if code not in self.semesters:
             return None
 
         self.semesters[code].update(updates)
-        self._save_data()
+        self._persist('semesters')
         return self.semesters[code]
 
     # ============ MATRÍCULAS ============
 
     def get_enrolled_disciplines(self, semester_code: str) -> List[Dict]:
         """Obtém as disciplinas matriculadas em um semestre."""
-        if semester_code not in self.enrollments:
-            return []
+        with self.lock:
+            discipline_codes = self.enrollments.get(semester_code)
+            if discipline_codes is None:
+                return []
 
-        discipline_codes = self.enrollments[semester_code]
-        return [self.disciplines[code] for code in discipline_codes if code in self.disciplines]
+            return [disc for disc in map(self.disciplines.get, discipline_codes) if disc is not None]
 
+    def get_enrollment_context(self, semester_code: str, discipline_code: str) -> EnrollmentContext:
+        """
+        Obtém semestre, disciplina e disciplinas concluídas para validar uma
+        matrícula. O chamador deve segurar self.lock até concluir a matrícula.
+        """
+        with self.lock:
+            return EnrollmentContext(
+                semester=self.semesters.get(semester_code),
+                discipline=self.disciplines.get(discipline_code),
+                completed_disciplines=self.completed_disciplines
+            )
+
+    @_synchronized
     def enroll_discipline(self, semester_code: str, discipline_code: str) -> bool:
         """Matricula um aluno em uma disciplina."""
         if semester_code not in self.enrollments:
@@ -298,27 +577,117 @@ class Database:
         if discipline_code not in self.disciplines:
             return False
 
-        if discipline_code not in self.enrollments[semester_code]:
-            self.enrollments[semester_code].append(discipline_code)
-            self._save_data()
+        enrolled = self.enrollments[semester_code]
+        if discipline_code not in enrolled:
+            enrolled[discipline_code] = None
+            self._discipline_to_semesters[discipline_code].add(semester_code)
+            index = self._schedule_index.get(semester_code)
+            if index is not None:
+                self._index_schedules(index, self.disciplines[discipline_code])
+            if semester_code in self._semester_occupancy:
+                self._semester_occupancy[semester_code] |= self._get_occupancy(discipline_code)
+            self._persist('enrollments')
             return True
 
         return False
 
+    @_synchronized
     def unenroll_discipline(self, semester_code: str, discipline_code: str) -> bool:
         """Remove matrícula de uma disciplina."""
         if semester_code not in self.enrollments:
             return False
 
-        if discipline_code in self.enrollments[semester_code]:
-            self.enrollments[semester_code].remove(discipline_code)
-            self._save_data()
+        enrolled = self.enrollments[semester_code]
+        if discipline_code in enrolled:
+            del enrolled[discipline_code]
+            self._discipline_to_semesters[discipline_code].discard(semester_code)
+            self._schedule_index.pop(semester_code, None)
+            self._semester_occupancy.pop(semester_code, None)
+            self._persist('enrollments')
             return True
 
         return False
 
+    def find_schedule_conflict(self, semester_code: str, discipline: Dict) -> Optional[Dict]:
+        """
+        Procura uma disciplina matriculada no semestre com horário em conflito.
+
+        Primeiro compara os mapas de ocupação: sem interseção, não há conflito.
+        Caso contrário, usa o índice de horários por dia, ordenado pelo início:
+        só os horários que começam antes do fim do horário verificado podem
+        conflitar, e conflitam se terminam depois do seu início.
+
+        Returns:
+            Optional[Dict]: Disciplina em conflito ou None
+        """
+        if not self._get_occupancy(discipline['code']) & self._get_semester_occupancy(semester_code):
+            return None
+
+        index = self._get_schedule_index(semester_code)
+        for sch in discipline.get('schedules', []):
+            bucket = index.get(sch.get('day'))
+            if not bucket:
+                continue
+
+            start, end = ScheduleValidation.schedule_minutes(sch)
+            i = bisect_left(bucket, (end,))
+            for _, other_end, code in bucket[:i]:
+                if other_end > start:
+                    return self.disciplines.get(code)
+
+        return None
+
+    def _get_schedule_index(self, semester_code: str) -> Dict[int, List[Tuple[int, int, str]]]:
+        """Obtém (construindo se necessário) o índice de horários de um semestre."""
+        index = self._schedule_index.get(semester_code)
+        if index is None:
+            index = {}
+            for disc in self.get_enrolled_disciplines(semester_code):
+                self._index_schedules(index, disc)
+            self._schedule_index[semester_code] = index
+        return index
+
+    def _get_occupancy(self, discipline_code: str) -> int:
+        """Obtém (calculando se necessário) o mapa de ocupação de uma disciplina."""
+        mask = self._occupancy.get(discipline_code)
+        if mask is None:
+            disc = self.disciplines.get(discipline_code)
+            mask = ScheduleValidation.occupancy_mask(disc.get('schedules', [])) if disc else 0
+            self._occupancy[discipline_code] = mask
+        return mask
+
+    def _get_semester_occupancy(self, semester_code: str) -> int:
+        """Obtém (calculando se necessário) a ocupação de um semestre."""
+        mask = self._semester_occupancy.get(semester_code)
+        if mask is None:
+            mask = 0
+            for code in self.enrollments.get(semester_code, ()):
+                mask |= self._get_occupancy(code)
+            self._semester_occupancy[semester_code] = mask
+        return mask
+
+    def _clear_schedule_caches(self, discipline_code: str):
+        """Descarta os caches de horários afetados por mudanças em uma disciplina."""
+        self._occupancy.pop(discipline_code, None)
+        self._semester_occupancy.clear()
+        self._schedule_index.clear()
+
+    @staticmethod
+    def _index_schedules(index: Dict[int, List[Tuple[int, int, str]]], discipline: Dict):
+        """
+        Adiciona os horários de uma disciplina ao índice, mantendo a ordenação.
+        Horários que não estão no formato HH:MM não entram no índice.
+        """
+        for sch in discipline.get('schedules', []):
+            try:
+                start, end = ScheduleValidation.schedule_minutes(sch)
+            except ValueError:
+                continue
+            insort(index.setdefault(sch['day'], []), (start, end, discipline['code']))
+
     # ============ NOTAS ============
 
+    @_synchronized
     def set_grades(self, discipline_code: str, n1: float, n2: float, n3: float) -> bool:
         """Define as notas de uma disciplina."""
         if discipline_code not in self.disciplines:
@@ -328,7 +697,7 @@ class Database:
         self.disciplines[discipline_code]['n2'] = n2
         self.disciplines[discipline_code]['n3'] = n3
 
-        self._save_data()
+        self._persist('disciplines')
         return True
 
     def get_grades(self, discipline_code: str) -> Optional[Dict]:
@@ -346,27 +715,66 @@ class Database:
 
     # ============ ESTATÍSTICAS ============
 
+    def _get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna os agregados das disciplinas, recalculando-os em uma única
+        passada apenas se alguma escrita ocorreu desde o último cálculo.
+        """
+        with self.lock:
+            if self._stats_dirty:
+                total_hours = 0
+                media_sum = 0.0
+                media_count = 0
+                for disc in self.disciplines.values():
+                    total_hours += disc.get('hours', 0)
+                    media = disc.get('media_final')
+                    if media and media >= 7.0:
+                        media_sum += media
+                        media_count += 1
+
+                self._stats_cache = {
+                    'total_hours': total_hours,
+                    'general_average': (
+                        round(media_sum / media_count, 2) if media_count else None
+                    ),
+                }
+                self._stats_dirty = False
+            return self._stats_cache
+
     def get_total_hours(self) -> int:
         """Obtém o total de horas do curso."""
-        return sum(disc.get('hours', 0) for disc in self.disciplines.values())
+        return self._get_stats()['total_hours']
 
     def get_completed_hours(self) -> int:
         """Obtém as horas de disciplinas concluídas (média >= 7.0)."""
-        return sum(
-            disc.get('hours', 0)
-            for disc in self.disciplines.values()
-            if disc.get('media_final') and disc.get('media_final') >= 7.0
-        )
+        return self.completed_hours_total
 
     def get_general_average(self) -> Optional[float]:
         """Obtém a média geral do aluno."""
-        completed = [
-            disc.get('media_final')
-            for disc in self.disciplines.values()
-            if disc.get('media_final') and disc.get('media_final') >= 7.0
-        ]
+        return self._get_stats()['general_average']
+
+    def get_progress(self, semester_code: str) -> Dict:
+        """
+        Obtém o progresso do curso, com a contagem de matrículas do semestre.
+        O resultado fica em cache por PROGRESS_CACHE_TTL segundos e é
+        descartado em qualquer operação de escrita.
+        """
+        cached = self._progress_cache.get(semester_code)
+        if cached and time.monotonic() - cached[0] < PROGRESS_CACHE_TTL:
+            return cached[1]
+
+        completed_hours = self.get_completed_hours()
+        progress = {
+            'total_hours': TOTAL_HOURS_CCP02,
+            'completed_hours': completed_hours,
+            'percentage': AcademicCalculations.calculate_course_progress(completed_hours),
+            'enrolled_count': len(self.enrollments.get(semester_code, ())),
+            'general_average': self.get_general_average()
+        }
+
+        self._progress_cache[semester_code] = (time.monotonic(), progress)
+        return progress
 
-        if not completed:
-            return None
 
-        return round(sum(completed) / len(completed), 2)
+# Instância única compartilhada por todas as rotas
+db = Database()
@@ -100,6 +100,15 @@ class GradesRequest(BaseModel):
     n3: Optional[float] = None
 
 
+class ScheduleEntry(BaseModel):
+    """Aula no cronograma semanal de um semestre."""
+    discipline_code: str
+    discipline_name: str
+    start: str  # Formato HH:MM
+    end: str  # Formato HH:MM
+    location: str
+
+
 class ScheduleConflictResponse(BaseModel):
     """Resposta de verificação de conflito de horários."""
     has_conflict: bool
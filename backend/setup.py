@@ -0,0 +1,21 @@
+"""
+Compilação opcional com mypyc da lógica de negócio e do parser de CSV
+(o laço por linha da importação).
+
+Uso (a partir do diretório backend/):
+    pip install mypy
+    python setup.py build_ext --inplace
+
+Gera extensões C ao lado de app/business_logic.py e app/csv_importer.py,
+que passam a ser importadas no lugar dos módulos Python. Sem as extensões,
+os módulos Python puros continuam sendo usados normalmente.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="planejador-academico-ufrpe",
+    packages=[],
+    ext_modules=mypycify(["app/business_logic.py", "app/csv_importer.py"]),
+)
@@ -0,0 +1,45 @@
+"""
+Testes do parser incremental de CSV.
+
+Executar a partir do diretório backend/:
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from app.csv_importer import CSVImporter, CSVStreamParser
+
+HEADER = 'Código;Nome;Professor;Período;Local;Dia;Início;Fim;Pré-requisitos\n'
+
+
+def parse_in_chunks(data: bytes, size: int):
+    """Alimenta o parser com blocos de tamanho fixo e retorna o resultado."""
+    parser = CSVStreamParser()
+    for i in range(0, len(data), size):
+        parser.feed(data[i:i + size])
+    return parser.close()
+
+
+class CSVStreamParserTest(unittest.TestCase):
+
+    def test_quoted_newline_split_across_chunks(self):
+        """Campo entre aspas com quebra de linha cortado entre dois blocos."""
+        data = (
+            HEADER
+            + '14117;"Cálculo\nI";Prof;1;"Sala ""A""\nBloco 2";2;08:00;10:00;\n'
+            + '06418;Algoritmos;Prof;1;Lab;3;10:00;12:00;14117\n'
+        ).encode('utf-8')
+        expected = CSVImporter.parse_csv_bytes(data)
+
+        disciplines, errors = expected
+        self.assertEqual(errors, [])
+        self.assertEqual([d['code'] for d in disciplines], ['14117', '06418'])
+        self.assertEqual(disciplines[0]['name'], 'Cálculo\nI')
+
+        for size in range(1, len(data) + 1):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(parse_in_chunks(data, size), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
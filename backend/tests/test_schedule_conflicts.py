@@ -0,0 +1,106 @@
+"""
+Testes da verificação de conflitos de horário.
+
+Executar a partir do diretório backend/:
+    python -m unittest discover tests
+"""
+
+import random
+import shutil
+import tempfile
+import unittest
+
+from app.business_logic import ScheduleValidation
+from app.database import Database
+from app.models import DisciplineCreate, ScheduleItem, SemesterCreate
+
+# Inclui dias fora da semana, para exercitar o caminho sem máscara
+DAYS = [1, 2, 3, 4, 5, 0, 7, 10 ** 6]
+
+
+def random_time(rng: random.Random) -> str:
+    return f"{rng.randrange(7, 23):02d}:{rng.choice([0, 10, 15, 30, 45, 59]):02d}"
+
+
+def random_schedules(rng: random.Random):
+    """Horários aleatórios, incluindo intervalos vazios e invertidos."""
+    schedules = []
+    for _ in range(rng.randint(0, 3)):
+        start = random_time(rng)
+        end = start if rng.random() < 0.1 else random_time(rng)
+        schedules.append(ScheduleItem(
+            day=rng.choice(DAYS[:3] if rng.random() < 0.9 else DAYS),
+            start=start, end=end, location='X'
+        ))
+    return schedules
+
+
+class ScheduleConflictTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.db = Database(self.data_dir)
+        self.db.flush()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_matches_pairwise_check(self):
+        """find_schedule_conflict encontra conflito sempre que a comparação par a par encontra."""
+        rng = random.Random(1234)
+        db = self.db
+
+        with db.batch():
+            for trial in range(300):
+                semester_code = f'T{trial}'
+                db.create_semester(SemesterCreate(code=semester_code, status='Planejado'))
+
+                enrolled = []
+                for i in range(rng.randint(0, 5)):
+                    code = f'{semester_code}-{i}'
+                    db.create_discipline(DisciplineCreate(
+                        code=code, name=code, professor='P', period=1, hours=60,
+                        schedules=random_schedules(rng)
+                    ))
+                    db.enroll_discipline(semester_code, code)
+                    enrolled.append(db.get_discipline(code))
+
+                code = f'{semester_code}-new'
+                candidate = db.create_discipline(DisciplineCreate(
+                    code=code, name=code, professor='P', period=1, hours=60,
+                    schedules=random_schedules(rng)
+                ))
+
+                expected = any(
+                    ScheduleValidation.has_schedule_conflict(
+                        candidate['schedules'], disc['schedules']
+                    )[0]
+                    for disc in enrolled
+                )
+                found = db.find_schedule_conflict(semester_code, candidate)
+                with self.subTest(trial=trial):
+                    self.assertEqual(found is not None, expected)
+                    if found is not None:
+                        self.assertTrue(ScheduleValidation.has_schedule_conflict(
+                            candidate['schedules'], found['schedules']
+                        )[0])
+
+    def test_discipline_created_after_enrollment(self):
+        """Código matriculado antes de existir não fica com ocupação vazia em cache."""
+        db = self.db
+        db.create_semester(SemesterCreate(code='T', status='Planejado'))
+        db.enrollments['T']['GHOST'] = None
+        self.assertIsNone(db.find_schedule_conflict('T', {'code': 'X', 'schedules': []}))
+
+        schedule = [ScheduleItem(day=1, start='08:00', end='10:00', location='X')]
+        db.create_discipline(DisciplineCreate(
+            code='GHOST', name='G', professor='P', period=1, hours=60, schedules=schedule
+        ))
+        candidate = db.create_discipline(DisciplineCreate(
+            code='NEW', name='N', professor='P', period=1, hours=60, schedules=schedule
+        ))
+        self.assertIsNotNone(db.find_schedule_conflict('T', candidate))
+
+
+if __name__ == '__main__':
+    unittest.main()